@@ -0,0 +1,196 @@
+import re
+from typing import List, Dict, Any, Callable, Iterable, Pattern, Set, Tuple
+
+from legal_glossary import ARTICLE_HEADING_PATTERN, normalize_arabic
+
+# One cited number: "84", "(84)" or "80(2)(a)"; sub-clause parentheses are not articles.
+_CITED_NUMBER = r'\(?\s*\d+\s*\)?(?:\s*\(\s*[0-9a-z]{1,3}\s*\))*'
+_NUMBER_PATTERN = re.compile(r'\(?\s*(\d+)\s*\)?(?:\s*\(\s*[0-9a-z]{1,3}\s*\))*')
+# Numbers in a citation list are joined by commas, "and"/"or"/"&" or the Arabic "و"/"أو".
+_NUMBER_LIST = r'%s(?:\s*(?:[,،]\s*(?:(?:and|or)\b|و|او\b)?|\band\b|\bor\b|&|\bو|\bاو\b)\s*%s)*' % (
+    _CITED_NUMBER, _CITED_NUMBER)
+# Article keywords (normalized text): Article(s), Art., Arts. and the Arabic singular,
+# dual and plural with their attached prefixes (وال/بال/لل/ال...).
+_ARTICLE_KEYWORD = (r'(?:\barticles?\b|\barts?\.|\b[وف]?(?:[بك]?ال|لل|[بلك])?'
+                    r'(?:ماده|مادتين|مادتان|مواد)|\bم(?=\s*\(?\s*\d))')
+CITATION_PATTERN = re.compile(r'(%s)\s*(?:no\.?\s*)?(%s)?' % (_ARTICLE_KEYWORD, _NUMBER_LIST), re.IGNORECASE)
+# A keyword without numbers is only a citation we failed to read when it is not a
+# plain reference such as "this Article" / "هذه المادة".
+_GENERIC_REFERENCE = re.compile(r'\b(?:the|this|that|these|those|said|same|each|such|which|an?|هذه|هذا|تلك|ذلك)\s*$',
+                                re.IGNORECASE)
+_RANGE_PATTERN = re.compile(r'^\s*(?:-|–|to\b|through\b|الى\b|حتى\b)\s*\d')
+
+
+def parse_citations(text: str) -> Tuple[Set[int], List[str]]:
+    """
+    Article numbers cited in English or Arabic text, and the citation wording that
+    could not be read.
+
+    Grouped citations ("Articles 98, 101, and 104", "المادتين 80 و 84") yield every
+    number. Keywords followed by something other than a number list (ordinal words,
+    ranges such as "Articles 98-104") are returned as unparsed, so callers can fail
+    closed instead of trusting a partial set.
+    """
+    normalized = normalize_arabic(text)
+    numbers: Set[int] = set()
+    unparsed = []
+    for match in CITATION_PATTERN.finditer(normalized):
+        keyword, number_list = match.group(1), match.group(2)
+        if not number_list:
+            if not _GENERIC_REFERENCE.search(normalized[:match.start()]):
+                unparsed.append(normalized[match.start():match.end() + 20].strip())
+            continue
+        numbers.update(int(n) for n in _NUMBER_PATTERN.findall(number_list))
+        if _RANGE_PATTERN.match(normalized[match.end():]):
+            unparsed.append(normalized[match.start():match.end() + 20].strip())
+    return numbers, unparsed
+
+
+def cited_articles(text: str) -> Set[int]:
+    """Article numbers cited in English ("Articles 80 and 84") or Arabic ("المادة ٨٠") text."""
+    return parse_citations(text)[0]
+
+
+def _overlaps(text_a: str, text_b: str, probe: int = 60) -> bool:
+    return text_a[:probe] in text_b or text_b[:probe] in text_a
+
+
+def article_chunk_map(text: str, sentence_splitter: Pattern, max_sentences: int = 8,
+                      overlap: int = 2, min_length: int = 10) -> Dict[int, Set[int]]:
+    """
+    Map article number -> indices of the chunks that hold its sentences.
+
+    Mirrors the systems' chunk_text (same splitter, sentence filter and window), so
+    index i is the i-th chunk that chunk_text returns for this text. Headings such as
+    "Article 53" are too short to survive the sentence filter, so the current article
+    is tracked while walking the sentences and each kept sentence is labelled with it.
+    """
+    labels = []
+    current = None
+    for sentence in sentence_splitter.split(text):
+        sentence = sentence.strip()
+        heading = ARTICLE_HEADING_PATTERN.match(sentence)
+        if heading:
+            current = int(heading.group(1))
+        if len(sentence) > min_length:
+            labels.append(current)
+
+    articles: Dict[int, Set[int]] = {}
+    for chunk_id, start in enumerate(range(0, len(labels), max_sentences - overlap)):
+        for article in labels[start:start + max_sentences]:
+            if article is not None:
+                articles.setdefault(article, set()).add(chunk_id)
+    return articles
+
+
+class GatingPolicy:
+    """
+    Confidence gate that lets a query skip the Verifier and/or Critic stages.
+
+    The decision is local and cheap. Evidence is unambiguous only when every article
+    the LegalExtractor cited occurs in the top passage or the chunks overlapping it
+    (checked through the article -> chunk map built at ingest), none of its citation
+    wording was left unparsed, the top passage is relevant enough, and it clearly
+    leads the best distinct runner-up. Then the Critic is skipped. The Verifier is
+    skipped too when the margin is decisive, or when the query names an article (an
+    article-index hit) that the extractor cited from that evidence. A citation taken
+    from a lower-ranked passage never rides on the top passage's lead.
+
+    Relevance is the top score divided by the query's total IDF weight (the
+    "relevance" field of retrieved docs), so the threshold does not drift with
+    query length or glossary expansions. At 1.0 the top passage earns at least
+    what matching every query term would; phrase and proximity boosts let a
+    passage missing a minor term still reach it.
+    """
+    def __init__(self, min_relevance: float = 1.0, critic_margin: float = 0.25,
+                 verifier_margin: float = 0.5, enabled: bool = True):
+        self.min_relevance = min_relevance
+        self.critic_margin = critic_margin
+        self.verifier_margin = verifier_margin
+        self.enabled = enabled
+
+    def signals(self, query: str, retrieved_docs: List[Dict[str, Any]], extracted: str,
+                chunk_articles: Dict[str, Set[int]]) -> Dict[str, Any]:
+        ranked = sorted(retrieved_docs, key=lambda doc: doc["score"], reverse=True)
+        top_score = ranked[0]["score"] if ranked else 0.0
+        top_relevance = ranked[0].get("relevance", 0.0) if ranked else 0.0
+        # Chunks overlap by two sentences, so the runner-up is the best chunk
+        # that does not share text with the top one rather than its neighbour.
+        second_score = next((doc["score"] for doc in ranked[1:]
+                             if not _overlaps(doc["text"], ranked[0]["text"])), 0.0)
+        retrieved_articles = set()
+        lead_articles = set()  # Articles of the top passage and the chunks overlapping it
+        for doc in retrieved_docs:
+            articles = chunk_articles.get(doc["text"], ())
+            retrieved_articles.update(articles)
+            if doc is ranked[0] or _overlaps(doc["text"], ranked[0]["text"]):
+                lead_articles.update(articles)
+        query_articles = cited_articles(query)
+        extracted_articles, unparsed = parse_citations(extracted)
+        # Citation wording that could not be read may hide an unretrieved article: fail closed.
+        citations_supported = bool(extracted_articles) and not unparsed and extracted_articles <= lead_articles
+        return {
+            "top_score": round(top_score, 3),
+            "top_relevance": round(top_relevance, 3),
+            "score_margin": round((top_score - second_score) / top_score, 3) if top_score else 0.0,
+            "retrieved_articles": sorted(retrieved_articles),
+            "lead_articles": sorted(lead_articles),
+            "cited_articles": sorted(extracted_articles),
+            "unsupported_citations": sorted(extracted_articles - lead_articles),
+            "unparsed_citations": unparsed,
+            "citations_supported": citations_supported,
+            "article_hit": citations_supported and bool(query_articles) and query_articles <= extracted_articles,
+        }
+
+    def decide(self, query: str, retrieved_docs: List[Dict[str, Any]], extracted: str,
+               chunk_articles: Dict[str, Set[int]],
+               stages: Iterable[str] = ("Verifier", "Critic")) -> Dict[str, Any]:
+        """Return the gating decision, the signals behind it and the agent calls it saves."""
+        signals = self.signals(query, retrieved_docs, extracted, chunk_articles)
+        skip_critic = (self.enabled
+                       and signals["citations_supported"]
+                       and signals["top_relevance"] >= self.min_relevance
+                       and signals["score_margin"] >= self.critic_margin)
+        skip_verifier = skip_critic and (signals["article_hit"]
+                                         or signals["score_margin"] >= self.verifier_margin)
+        skipped = [stage for stage in stages
+                   if (stage == "Verifier" and skip_verifier) or (stage == "Critic" and skip_critic)]
+        return {
+            "skip_verifier": "Verifier" in skipped,
+            "skip_critic": "Critic" in skipped,
+            "skipped": skipped,
+            "saved_calls": len(skipped),
+            "signals": signals,
+        }
+
+
+def evaluate_policy(policy: GatingPolicy, cases: List[Dict[str, Any]],
+                    retrieve: Callable[[str], List[Dict[str, Any]]],
+                    chunk_articles: Dict[str, Set[int]]) -> Dict[str, Any]:
+    """
+    Replay a policy over a labelled offline set without any LLM calls.
+
+    Each case provides a "query", the "cited_articles" the extractor output cites
+    (including wrong or unretrieved citations), optionally the "extracted" wording
+    itself (e.g. a grouped "Articles 151 and 84"), and "needs_review" (whether
+    verification changes the answer). Skipping a stage on a case that needs review
+    counts as an unsafe skip.
+    """
+    saved_calls = 0
+    gated = 0
+    unsafe_skips = []
+    for case in cases:
+        extracted = case.get("extracted") or " ".join(f"Article {n}" for n in case.get("cited_articles", []))
+        decision = policy.decide(case["query"], retrieve(case["query"]), extracted, chunk_articles)
+        saved_calls += decision["saved_calls"]
+        if decision["skipped"]:
+            gated += 1
+            if case.get("needs_review"):
+                unsafe_skips.append(case["query"])
+    return {
+        "cases": len(cases),
+        "gated_queries": gated,
+        "saved_calls": saved_calls,
+        "unsafe_skips": unsafe_skips,
+        "skip_precision": round((gated - len(unsafe_skips)) / gated, 3) if gated else 1.0,
+    }
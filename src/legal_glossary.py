@@ -0,0 +1,179 @@
+import re
+import time
+from typing import List, Dict, Any, Tuple
+
+# Curated Arabic -> English legal terms for the Saudi Labor Law translation.
+# Keys are written naturally; they are normalized when the glossary is compiled.
+LEGAL_TERMS = {
+    "مكافأة نهاية الخدمة": ["end-of-service award", "end of service"],
+    "نهاية الخدمة": ["end of service"],
+    "فترة التجربة": ["probation period", "probationary period"],
+    "مدة التجربة": ["probation period"],
+    "التجربة": ["probation"],
+    "عقد العمل": ["employment contract", "work contract"],
+    "إنهاء العقد": ["termination of contract", "terminate the contract"],
+    "إنهاء": ["termination"],
+    # "فصل" alone also means "chapter", so only dismissal phrasings are listed.
+    "فصل العامل": ["dismissal", "termination", "worker"],
+    "فصل الموظف": ["dismissal", "termination", "worker"],
+    "الفصل التعسفي": ["termination", "valid reason"],
+    "الاستقالة": ["resignation", "resign"],
+    "مدة الإخطار": ["notice period", "written notice"],
+    "مهلة الإشعار": ["notice period", "written notice"],
+    "الإخطار": ["notice"],
+    "الإشعار": ["notice"],
+    "صاحب العمل": ["employer"],
+    "العامل": ["worker"],
+    "الموظف": ["worker", "employee"],
+    "الأجر": ["wage"],
+    "الراتب": ["wage", "salary"],
+    "ساعات العمل": ["working hours"],
+    "العمل الإضافي": ["overtime", "additional hours"],
+    "الإجازة السنوية": ["annual leave"],
+    "الإجازة المرضية": ["sick leave"],
+    "إجازة الوضع": ["maternity leave"],
+    "إجازة الأمومة": ["maternity leave"],
+    "الإجازة": ["leave"],
+    "الراحة الأسبوعية": ["weekly rest day"],
+    "رمضان": ["Ramadan"],
+    "إصابة العمل": ["work injury"],
+    "عدم المنافسة": ["non-compete", "compete"],
+    "المنافسة": ["compete", "competition"],
+    "تعويض": ["compensation"],
+    "التعويض": ["compensation"],
+    "نظام العمل": ["labor law"],
+    "مكتب العمل": ["labor office"],
+    "الوزارة": ["ministry"],
+    "التدريب": ["training"],
+    "الأحداث": ["minors", "juveniles"],
+    "المرأة": ["women"],
+    "غرامة": ["fine"],
+    "العقوبات": ["penalties"],
+    "الجزاءات": ["disciplinary penalties"],
+    "التأديب": ["disciplinary"],
+    "شروط": ["conditions", "requirements"],
+    "حالات": ["cases"],
+}
+
+# Arabic article references, e.g. "المادة 80", "للمادة (٨٠)", "م ٨٠" (matched after normalization).
+ARTICLE_REF_PATTERN = re.compile(r'\b(?:وال|بال|فال|لل|ال)?(?:ماده|م)\s*\(?\s*(\d+)\s*\)?')
+ARTICLE_HEADING_PATTERN = re.compile(r'^\s*Article\s+(\d+)\s*$', re.MULTILINE)
+
+_DIACRITICS = re.compile(r'[ً-ْٰـ]')  # tashkeel, superscript alef, tatweel
+_CHAR_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي", "ة": "ه",
+    "٠": "0", "١": "1", "٢": "2", "٣": "3", "٤": "4",
+    "٥": "5", "٦": "6", "٧": "7", "٨": "8", "٩": "9",
+})
+# Attached conjunction/preposition + definite article prefixes, longest first.
+_ARABIC_PREFIXES = ("وال", "بال", "فال", "كال", "لل", "ال")
+# Single-letter clitics (and/so/with/for) attached to an indefinite noun, e.g. "لصاحب".
+# They are only tried at match time, because many words simply start with these letters.
+_ARABIC_CLITICS = ("و", "ف", "ب", "ل")
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_arabic(text: str) -> str:
+    """Orthographic normalization: unify alef/ya/ta marbuta, strip diacritics, map Arabic-Indic digits."""
+    return _DIACRITICS.sub("", text).translate(_CHAR_MAP).lower()
+
+
+def _stem(token: str) -> str:
+    for prefix in _ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def tokenize_normalized(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN_PATTERN.findall(normalize_arabic(text))]
+
+
+def _stem_candidates(token: str) -> List[str]:
+    """The stemmed token, then the stem with a leading clitic removed (if plausible)."""
+    candidates = [_stem(token)]
+    if token.startswith(_ARABIC_CLITICS) and len(token) > 3:
+        candidates.append(_stem(token[1:]))
+    return candidates
+
+
+class BilingualGlossary:
+    """
+    Compiled Arabic -> English legal glossary for cross-lingual keyword retrieval.
+
+    Terms are normalized and stored in a first-token lookup table so that a query
+    is expanded with a single greedy longest-match pass, without any LLM call.
+    Bootstrapping from the English corpus registers the article headings (so Arabic
+    article references map to "Article N") and drops expansions the corpus never uses.
+    """
+    def __init__(self, terms: Dict[str, List[str]] = None):
+        self.terms = dict(LEGAL_TERMS if terms is None else terms)
+        self.article_numbers = set()
+        self.vocabulary = set()
+        self._lookup: Dict[str, List[Tuple[Tuple[str, ...], str, List[str]]]] = {}
+        self._compile()
+
+    def bootstrap(self, corpus_text: str):
+        """Register article headings and the English vocabulary of the corpus, then recompile."""
+        self.article_numbers.update(int(n) for n in ARTICLE_HEADING_PATTERN.findall(corpus_text))
+        self.vocabulary.update(t.lower() for t in _TOKEN_PATTERN.findall(corpus_text))
+        self._compile()
+
+    def _compile(self):
+        lookup = {}
+        for term, expansions in self.terms.items():
+            key = tuple(tokenize_normalized(term))
+            if not key:
+                continue
+            if self.vocabulary:
+                expansions = [e for e in expansions
+                              if all(t.lower() in self.vocabulary for t in _TOKEN_PATTERN.findall(e))]
+            if expansions:
+                lookup.setdefault(key[0], []).append((key, term, expansions))
+        # Longest phrase first so that "مكافأة نهاية الخدمة" wins over "نهاية الخدمة".
+        for candidates in lookup.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+        self._lookup = lookup
+
+    def _match_at(self, first_token: str, following: List[str]):
+        """Longest glossary entry starting at this token; clitic-stripped forms are tried second."""
+        for first in _stem_candidates(first_token):
+            for key, term, term_expansions in self._lookup.get(first, ()):
+                if tuple(following[:len(key) - 1]) == key[1:]:
+                    return key, term, term_expansions
+        return None
+
+    def expand(self, query: str) -> Dict[str, Any]:
+        """Append English equivalents of the Arabic legal terms found in the query."""
+        start_time = time.perf_counter()
+        normalized = normalize_arabic(query)
+        raw_tokens = _TOKEN_PATTERN.findall(normalized)
+        tokens = [_stem(t) for t in raw_tokens]
+        matches = []
+        expansions = []
+
+        i = 0
+        while i < len(tokens):
+            matched = self._match_at(raw_tokens[i], tokens[i + 1:])
+            if matched:
+                key, term, term_expansions = matched
+                matches.append({"term": term, "expansions": term_expansions})
+                expansions.extend(term_expansions)
+                i += len(key)
+            else:
+                i += 1
+
+        for number in ARTICLE_REF_PATTERN.findall(normalized):
+            if not self.article_numbers or int(number) in self.article_numbers:
+                matches.append({"term": f"المادة {number}", "expansions": [f"Article {number}"]})
+                expansions.append(f"Article {number}")
+
+        # Preserve order while removing repeated expansions.
+        expansions = list(dict.fromkeys(expansions))
+        expanded_query = f"{query} {' '.join(expansions)}" if expansions else query
+        return {
+            "query": query,
+            "expanded_query": expanded_query,
+            "matches": matches,
+            "expansion_time_us": round((time.perf_counter() - start_time) * 1e6, 1),
+        }
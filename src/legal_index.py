@@ -0,0 +1,152 @@
+import math
+import re
+from typing import List, Dict, Tuple
+
+from legal_glossary import tokenize_normalized
+
+# Function words that carry no retrieval signal on their own but still
+# take part in exact phrases such as "end of service award".
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "in", "on", "for", "by", "with", "and", "or",
+    "is", "are", "be", "what", "which", "who", "how", "under", "about", "during",
+    "if", "it", "its", "this", "that", "as", "at", "from", "do", "does", "i",
+}
+PHRASE_BOOST = 2.0      # Multiplier on the IDF mass of an exactly matched phrase
+PROXIMITY_BOOST = 0.5   # Multiplier on the IDF mass of two query terms found close together
+PROXIMITY_WINDOW = 5    # Maximum token distance that still earns a proximity boost
+MAX_PHRASE_LENGTH = 4
+QUOTED_PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+
+class PositionalIndex:
+    """
+    Positional inverted index over knowledge-base chunks.
+
+    Each term maps to {chunk_id: [positions]}, so exact phrases and term proximity
+    are evaluated by intersecting postings instead of rescanning chunk text.
+    Chunk ids follow the order in which chunks were added.
+    """
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.num_chunks = 0
+
+    def add_chunks(self, chunks: List[str]):
+        for chunk in chunks:
+            chunk_id = self.num_chunks
+            for position, term in enumerate(tokenize_normalized(chunk)):
+                self.postings.setdefault(term, {}).setdefault(chunk_id, []).append(position)
+            self.num_chunks += 1
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + self.num_chunks / df) if df else 0.0
+
+    def query_weight(self, query: str) -> float:
+        """Total IDF of the query's distinct content terms: what a chunk matching every term earns before boosts."""
+        terms = dict.fromkeys(t for t in tokenize_normalized(query) if t not in STOPWORDS)
+        return sum(self.idf(term) for term in terms)
+
+    def phrase_matches(self, phrase: List[str]) -> Dict[int, int]:
+        """Return {chunk_id: occurrences} for chunks containing the exact token sequence."""
+        term_postings = [self.postings.get(term) for term in phrase]
+        if not phrase or not all(term_postings):
+            return {}
+        # Walk the rarest term's chunks and intersect with the others.
+        candidates = set(min(term_postings, key=len))
+        for postings in term_postings:
+            candidates.intersection_update(postings)
+
+        matches = {}
+        for chunk_id in candidates:
+            starts = set(term_postings[0][chunk_id])
+            for offset, postings in enumerate(term_postings[1:], start=1):
+                positions = set(postings[chunk_id])
+                starts = {p for p in starts if p + offset in positions}
+                if not starts:
+                    break
+            if starts:
+                matches[chunk_id] = len(starts)
+        return matches
+
+    def min_distance(self, term_a: str, term_b: str) -> Dict[int, int]:
+        """Return {chunk_id: smallest token distance} for chunks containing both terms."""
+        postings_a = self.postings.get(term_a, {})
+        postings_b = self.postings.get(term_b, {})
+        distances = {}
+        for chunk_id in postings_a.keys() & postings_b.keys():
+            positions_a, positions_b = postings_a[chunk_id], postings_b[chunk_id]
+            i = j = 0
+            best = math.inf
+            # Positions are appended in order, so a linear merge finds the closest pair.
+            while i < len(positions_a) and j < len(positions_b):
+                best = min(best, abs(positions_a[i] - positions_b[j]))
+                if positions_a[i] < positions_b[j]:
+                    i += 1
+                else:
+                    j += 1
+            distances[chunk_id] = best
+        return distances
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, int]]:
+        """
+        Score chunks by IDF-weighted term matches plus phrase and proximity boosts.
+        Quoted phrases in the query ("notice period") are required to match exactly.
+        Returns (score, chunk_id) pairs, best first.
+        """
+        return self.search_batch([query], top_k=top_k)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[float, int]]]:
+        """
+        Score many queries in one pass. Each distinct term's postings are walked once
+        for the whole batch, and phrase/proximity intersections are cached so that
+        queries sharing legal phrases reuse them.
+        """
+        tokenized = [tokenize_normalized(query) for query in queries]
+        content_terms = [list(dict.fromkeys(t for t in tokens if t not in STOPWORDS)) for tokens in tokenized]
+        scores: List[Dict[int, float]] = [{} for _ in queries]
+
+        term_queries: Dict[str, List[int]] = {}
+        for query_id, terms in enumerate(content_terms):
+            for term in terms:
+                term_queries.setdefault(term, []).append(query_id)
+        for term, query_ids in term_queries.items():
+            weight = self.idf(term)
+            for chunk_id in self.postings.get(term, ()):
+                for query_id in query_ids:
+                    scores[query_id][chunk_id] = scores[query_id].get(chunk_id, 0.0) + weight
+
+        phrase_cache: Dict[Tuple[str, ...], Dict[int, int]] = {}
+        distance_cache: Dict[Tuple[str, str], Dict[int, int]] = {}
+        results = []
+        for query, tokens, terms, query_scores in zip(queries, tokenized, content_terms, scores):
+            # Phrase boosts: every query n-gram that starts and ends on a content term.
+            for n in range(2, MAX_PHRASE_LENGTH + 1):
+                for i in range(len(tokens) - n + 1):
+                    phrase = tuple(tokens[i:i + n])
+                    if phrase[0] in STOPWORDS or phrase[-1] in STOPWORDS:
+                        continue
+                    if phrase not in phrase_cache:
+                        phrase_cache[phrase] = self.phrase_matches(list(phrase))
+                    weight = PHRASE_BOOST * sum(self.idf(t) for t in phrase if t not in STOPWORDS)
+                    for chunk_id in phrase_cache[phrase]:
+                        query_scores[chunk_id] += weight
+
+            # Proximity boosts for consecutive content terms that occur close together.
+            for pair in zip(terms, terms[1:]):
+                if pair not in distance_cache:
+                    distance_cache[pair] = self.min_distance(*pair)
+                weight = PROXIMITY_BOOST * (self.idf(pair[0]) + self.idf(pair[1]))
+                for chunk_id, distance in distance_cache[pair].items():
+                    if distance <= PROXIMITY_WINDOW:
+                        query_scores[chunk_id] += weight * (PROXIMITY_WINDOW - distance + 1) / PROXIMITY_WINDOW
+
+            for quoted in QUOTED_PHRASE_PATTERN.findall(query):
+                phrase = tokenize_normalized(quoted)
+                if not phrase:
+                    continue  # Punctuation-only quotes ('"?"') constrain nothing
+                required = self.phrase_matches(phrase)
+                query_scores = {c: s for c, s in query_scores.items() if c in required}
+
+            ranked = sorted(((s, c) for c, s in query_scores.items() if s > 0), key=lambda x: (-x[0], x[1]))
+            results.append(ranked[:top_k])
+        return results
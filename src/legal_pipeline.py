@@ -2,12 +2,15 @@ import os
 import json
 import re
 from typing import List, Dict
-from openai import OpenAI
+from llm_clients import get_openai_client
 
-# Initialize OpenAI client (configured to use gpt-4.1-mini/nano for processing)
-# Note: For real embedding models like BGE-M3, we would typically use sentence-transformers.
-# In this, we will simulate the pipeline logic.
-client = OpenAI()
+# OpenAI client (configured to use gpt-4.1-mini/nano for processing), built on first access
+# so ingestion does not pay for it. Note: For real embedding models like BGE-M3, we would
+# typically use sentence-transformers. In this, we will simulate the pipeline logic.
+def __getattr__(name):
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class SaudiLegalPipeline:
     def __init__(self, embedding_model="bge-m3"):
@@ -0,0 +1,94 @@
+import re
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class IncrementalAnswerParser:
+    """
+    Incremental extractor for one string field of a JSON object being streamed.
+
+    Feed it the model output chunk by chunk; each call returns the newly decoded
+    characters of the field value (``"answer"`` by default), so the answer can be
+    forwarded while later fields such as ``sources``/``confidence`` are still being
+    generated. Escape sequences split across chunks are held back until complete.
+    The full text is kept in ``buffer`` for the final ``json.loads``.
+    """
+    def __init__(self, field: str = "answer"):
+        self.key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.buffer = ""
+        self.state = "seek"  # seek -> value -> done
+        self.position = 0
+
+    @property
+    def started(self) -> bool:
+        return self.state != "seek"
+
+    @property
+    def done(self) -> bool:
+        return self.state == "done"
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if self.state == "seek":
+            match = self.key_pattern.search(self.buffer)
+            if not match:
+                return ""
+            self.state = "value"
+            self.position = match.end()
+        if self.state != "value":
+            return ""
+
+        buf = self.buffer
+        out = []
+        i = self.position
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.state = "done"
+                i += 1
+                break
+            if ch != '\\':
+                out.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break  # Escape continues in the next chunk
+            if buf[i + 1] != 'u':
+                out.append(_ESCAPES.get(buf[i + 1], buf[i + 1]))
+                i += 2
+                continue
+            decoded, consumed = self._decode_unicode(buf, i)
+            if consumed == 0:
+                break
+            out.append(decoded)
+            i += consumed
+        self.position = i
+        return "".join(out)
+
+    @staticmethod
+    def _decode_unicode(buf: str, i: int):
+        """Decode a \\uXXXX escape (or surrogate pair) at ``i``; (text, 0) means wait for more input."""
+        if i + 6 > len(buf):
+            return "", 0
+        try:
+            code = int(buf[i + 2:i + 6], 16)
+        except ValueError:
+            return buf[i:i + 6], 6  # Malformed escape: forward it verbatim
+        if 0xD800 <= code < 0xDC00:
+            rest = buf[i + 6:i + 12]
+            if not rest:
+                return "", 0
+            if not '\\u'.startswith(rest[:2]):
+                return "\ufffd", 6  # Lone high surrogate: nothing to pair it with
+            if len(rest) < 6:
+                return "", 0
+            try:
+                low = int(rest[2:], 16)
+            except ValueError:
+                low = 0
+            if 0xDC00 <= low < 0xE000:
+                return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), 12
+            return "\ufffd", 6
+        if 0xDC00 <= code < 0xE000:
+            return "\ufffd", 6  # Lone low surrogate
+        return chr(code), 6
@@ -0,0 +1,36 @@
+import threading
+
+# The OpenAI SDK and python-dotenv are imported on first use, not at module import,
+# so retrieval-only and ingestion-only entry points start fast and work without an API key.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Return the process-wide OpenAI client, loading .env and constructing it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from dotenv import load_dotenv
+                from openai import OpenAI
+
+                # Load environment variables from a local .env file (if present)
+                load_dotenv()
+                _client = OpenAI()
+    return _client
+
+
+class LazyClientMixin:
+    """Gives a system a `client` attribute that is only built when an agent is first called."""
+    _client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_openai_client()
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
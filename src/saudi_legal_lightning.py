@@ -3,19 +3,29 @@ import re
 import os
 import time
 import asyncio
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from a local .env file (if present)
-load_dotenv()
+import threading
+import contextlib
+import contextvars
+from typing import List, Dict, Any, AsyncIterator, Tuple
+from legal_glossary import BilingualGlossary, normalize_arabic
+from legal_index import PositionalIndex
+from legal_streaming import IncrementalAnswerParser
+from llm_clients import LazyClientMixin
 
 # Configuration for Lightning Architecture
 FAST_MODEL = "gpt-4.1-nano" # High-speed model for initial triage and simple extraction
 DEEP_MODEL = "gpt-4.1-mini"  # High-accuracy model for planning and final synthesis
 JURISDICTION = "Saudi Arabia"
 
-class SaudiLegalLightning:
+# Per-query token counter; each batch task sets its own dict so concurrent queries are accounted separately.
+_token_usage: contextvars.ContextVar = contextvars.ContextVar("token_usage", default=None)
+
+
+def normalize_query(query: str) -> str:
+    """Deduplication key for batch runs: orthographically normalized, case- and punctuation-insensitive."""
+    return " ".join(re.findall(r'\w+', normalize_arabic(query)))
+
+class SaudiLegalLightning(LazyClientMixin):
     """
     Optimized Saudi Legal System using "Agent Lightning" principles with Self-Improvement:
     - Multi-Agent Disaggregation (Parallel processing)
@@ -24,9 +34,10 @@ class SaudiLegalLightning:
     - Memory-Augmented Reasoning: Stores successful patterns for future queries.
     """
     def __init__(self, feedback_file: str = "agent_feedback_loop.json"):
-        self.client = OpenAI()
         self.sentence_splitter = re.compile(r'(?<=[.!?؟\n])\s*')
         self.kb_chunks = []
+        self.glossary = BilingualGlossary()
+        self.index = PositionalIndex()
         self.feedback_file = feedback_file
         self.performance_history = self._load_feedback()
         
@@ -34,8 +45,10 @@ class SaudiLegalLightning:
         if os.path.exists("saudi_labor_law.txt"):
             with open("saudi_labor_law.txt", "r", encoding="utf-8") as f:
                 text = f.read()
+                self.glossary.bootstrap(text)
                 sentences = [s.strip() for s in self.sentence_splitter.split(text) if len(s.strip()) > 10]
                 self.kb_chunks = [" ".join(sentences[i:i + 8]) for i in range(0, len(sentences), 6)]
+                self.index.add_chunks(self.kb_chunks)
 
     def _load_feedback(self) -> List[Dict]:
         if os.path.exists(self.feedback_file):
@@ -50,8 +63,8 @@ class SaudiLegalLightning:
         with open(self.feedback_file, "w") as f:
             json.dump(self.performance_history, f, indent=2)
 
-    async def _call_agent_async(self, role: str, user_input: str, model: str = DEEP_MODEL, extra_context: str = "") -> str:
-        """Asynchronous agent call for parallel execution using externalized prompts."""
+    def _build_system_prompt(self, role: str, extra_context: str = "") -> str:
+        """System prompt from the externalized prompts plus learned optimizations."""
         with open("agent_prompts.json", "r") as f:
             prompts = json.load(f)
         
@@ -64,6 +77,11 @@ class SaudiLegalLightning:
             
         if extra_context:
             system_prompt += f"\nAdditional Context: {extra_context}"
+        return system_prompt
+
+    async def _call_agent_async(self, role: str, user_input: str, model: str = DEEP_MODEL, extra_context: str = "") -> str:
+        """Asynchronous agent call for parallel execution using externalized prompts."""
+        system_prompt = self._build_system_prompt(role, extra_context)
 
         loop = asyncio.get_event_loop()
         response = await loop.run_in_executor(None, lambda: self.client.chat.completions.create(
@@ -74,8 +92,62 @@ class SaudiLegalLightning:
             ],
             temperature=0
         ))
+        usage = _token_usage.get()
+        if usage is not None and getattr(response, "usage", None):
+            usage["total_tokens"] += response.usage.total_tokens
         return response.choices[0].message.content
 
+    async def _stream_agent_async(self, role: str, user_input: str, model: str = DEEP_MODEL,
+                                  extra_context: str = "") -> AsyncIterator[str]:
+        """Streaming agent call: yields content deltas as the model produces them."""
+        system_prompt = self._build_system_prompt(role, extra_context)
+        usage = _token_usage.get()
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def produce():
+            # The client's stream is a blocking iterator, so it is drained on an executor thread.
+            stream = None
+            try:
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_input}
+                    ],
+                    temperature=0,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                for chunk in stream:
+                    if stop.is_set():
+                        break  # Consumer went away; stop reading (and paying for) the response
+                    if usage is not None and getattr(chunk, "usage", None):
+                        usage["total_tokens"] += chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk.choices[0].delta.content)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                if stop.is_set() and hasattr(stream, "close"):
+                    stream.close()
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            await producer
+
     def _get_relevant_optimizations(self, role: str) -> str:
         """Retrieve successful patterns for a specific agent role."""
         relevant = [h for h in self.performance_history if h.get("role") == role and h.get("score", 0) > 0.8]
@@ -84,60 +156,254 @@ class SaudiLegalLightning:
         # Return the latest successful tip
         return relevant[-1].get("optimization_tip", "")
 
-    def _fast_retrieve(self, query: str, top_k: int = 8) -> List[str]:
-        """Lightning-fast keyword retrieval."""
-        keywords = set(query.lower().split())
-        scored_chunks = []
-        for chunk in self.kb_chunks:
-            score = len(keywords.intersection(set(chunk.lower().split())))
-            if score > 0:
-                scored_chunks.append((score, chunk))
-        
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
-        return [c[1] for c in scored_chunks[:top_k]]
+    def _fast_retrieve(self, query: str, top_k: int = 5) -> List[str]:
+        """Lightning-fast keyword retrieval with phrase and proximity boosts from the positional index."""
+        return [self.kb_chunks[chunk_id] for _, chunk_id in self.index.search(query, top_k=top_k)]
 
-    async def run_research_lightning(self, query: str):
-        print(f"--- [Lightning Mode + Self-Improvement] Processing: {query} ---")
-        start_time = time.time()
+    def _fast_retrieve_batch(self, queries: List[str], top_k: int = 5) -> List[List[str]]:
+        """Batched keyword retrieval: one postings walk per distinct term for the whole batch."""
+        return [[self.kb_chunks[chunk_id] for _, chunk_id in ranked]
+                for ranked in self.index.search_batch(queries, top_k=top_k)]
 
+    async def _research_stages(self, query: str,
+                               retrieval: Tuple[Dict[str, Any], List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run every stage before synthesis, yielding a progress event after each one.
+        The last event ("synthesis_input") carries the Synthesizer input and the retrieval trace.
+        """
         # 1. Parallel Phase: Triage & Planning
         triage_task = self._call_agent_async("Triage", query, model=FAST_MODEL)
         planner_task = self._call_agent_async("QueryPlanner", query)
         
         triage_result, plan = await asyncio.gather(triage_task, planner_task)
         print(f"Triage: {triage_result} | Plan generated.")
+        yield {"type": "stage", "stage": "triage_planning", "triage": triage_result}
 
-        # 2. Retrieval Phase
-        retrieved_docs = self._fast_retrieve(query)
+        # 2. Retrieval Phase (Arabic legal terms expanded to their English equivalents).
+        # Batch runs pass in the (expansion, docs) pair computed for the whole batch.
+        if retrieval is None:
+            expansion = self.glossary.expand(query)
+            retrieved_docs = self._fast_retrieve(expansion["expanded_query"])
+        else:
+            expansion, retrieved_docs = retrieval
+        if expansion["matches"]:
+            print(f"Glossary expansion: {expansion['expanded_query']}")
+        yield {"type": "stage", "stage": "retrieval", "retrieved": len(retrieved_docs),
+               "expanded_query": expansion["expanded_query"]}
         
         # 3. Parallel Phase: Extraction & Verification
         extraction_task = self._call_agent_async("LegalExtractor", str(retrieved_docs), model=FAST_MODEL)
         critic_pre_check = self._call_agent_async("Critic", query, model=FAST_MODEL)
         
         extracted, pre_critique = await asyncio.gather(extraction_task, critic_pre_check)
+        yield {"type": "stage", "stage": "extraction"}
 
-        # 4. Final Verification & Synthesis (Deep-Path)
+        # 4. Final Verification (Deep-Path)
         final_verification = await self._call_agent_async("Verifier", 
             f"Query: {query}\nExtraction: {extracted}\nSources: {retrieved_docs}",
             extra_context=f"Pre-check advice: {pre_critique}")
+        yield {"type": "stage", "stage": "verification"}
+
+        yield {"type": "synthesis_input", "expansion": expansion,
+               "input": f"Query: {query}\nVerified: {final_verification}"}
+
+    @staticmethod
+    def _parse_final_answer(final_answer_json: str, streamed_answer: str = "") -> Dict[str, Any]:
+        """Parse the Synthesizer output into a dict, falling back when it is not a JSON object."""
+        try:
+            result = json.loads(final_answer_json)
+            if isinstance(result, dict):
+                return result
+        except:
+            pass
+        # Tolerate markdown fences or prose around the JSON object
+        match = re.search(r'\{.*\}', final_answer_json, re.DOTALL)
+        if match:
+            try:
+                result = json.loads(match.group())
+                if isinstance(result, dict):
+                    return result
+            except:
+                pass
+        return {"answer": streamed_answer or final_answer_json, "jurisdiction": JURISDICTION, "confidence": 0.92}
+
+    async def run_research_lightning(self, query: str, retrieval: Tuple[Dict[str, Any], List[str]] = None,
+                                     self_improve: bool = True):
+        print(f"--- [Lightning Mode + Self-Improvement] Processing: {query} ---")
+        start_time = time.time()
 
-        final_answer_json = await self._call_agent_async("Synthesizer", 
-            f"Query: {query}\nVerified: {final_verification}")
+        async for event in self._research_stages(query, retrieval):
+            if event["type"] == "synthesis_input":
+                synthesis = event
+
+        # 5. Synthesis (Deep-Path)
+        final_answer_json = await self._call_agent_async("Synthesizer", synthesis["input"])
 
         end_time = time.time()
         execution_time = end_time - start_time
         print(f"Lightning Execution Time: {execution_time:.2f}s")
         
-        try:
-            result = json.loads(final_answer_json)
-        except:
-            result = {"answer": final_answer_json, "jurisdiction": JURISDICTION, "confidence": 0.92}
+        result = self._parse_final_answer(final_answer_json)
+        result["retrieval_trace"] = synthesis["expansion"]
 
-        # 5. Self-Improvement Phase: Evaluate and Learn
-        await self._perform_self_improvement(query, result, execution_time)
+        # 6. Self-Improvement Phase: Evaluate and Learn
+        if self_improve:
+            await self._perform_self_improvement(query, result, execution_time)
         
         return result
 
+    async def stream_research_lightning(self, query: str,
+                                        self_improve: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of run_research_lightning.
+
+        Yields "stage" events as the chain progresses, then "token" events carrying
+        the Synthesizer's answer text as it arrives, and finally a "result" event.
+        The answer field is decoded incrementally, so it is forwarded while sources and
+        confidence are still being generated. Prose before the JSON object is skipped;
+        if no answer field ever appears, the fallback answer is sent as one token
+        when the stream ends. Time-to-first-token is recorded
+        separately from total latency under result["latency"].
+        """
+        print(f"--- [Lightning Mode + Streaming] Processing: {query} ---")
+        start_time = time.time()
+
+        # aclosing: if the consumer stops early, the inner generators are closed right
+        # away (ending the model stream) instead of whenever the loop finalizes them.
+        async with contextlib.aclosing(self._research_stages(query)) as stages:
+            async for event in stages:
+                if event["type"] == "synthesis_input":
+                    synthesis = event
+                else:
+                    event["elapsed_s"] = round(time.time() - start_time, 3)
+                    yield event
+
+        synthesis_start = time.time()
+        yield {"type": "stage", "stage": "synthesis", "elapsed_s": round(synthesis_start - start_time, 3)}
+
+        parser = IncrementalAnswerParser()
+        streamed = []
+        first_token_time = None
+        async with contextlib.aclosing(self._stream_agent_async("Synthesizer", synthesis["input"])) as deltas:
+            async for delta in deltas:
+                # Prose may precede the JSON object, so everything goes through the parser; output
+                # that never contains an answer field is emitted whole once the stream ends.
+                text = parser.feed(delta)
+                if text:
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                    streamed.append(text)
+                    yield {"type": "token", "text": text}
+
+        streamed_answer = "".join(streamed)
+        result = self._parse_final_answer(parser.buffer, streamed_answer)
+        if first_token_time is None and result.get("answer"):
+            # Nothing could be forwarded incrementally; emit the parsed answer in one piece.
+            first_token_time = time.time()
+            yield {"type": "token", "text": str(result["answer"])}
+
+        end_time = time.time()
+        execution_time = end_time - start_time
+        print(f"Lightning Execution Time: {execution_time:.2f}s")
+        result["retrieval_trace"] = synthesis["expansion"]
+        result["latency"] = {
+            "time_to_first_token_s": round(first_token_time - start_time, 3) if first_token_time else None,
+            "synthesizer_ttft_s": round(first_token_time - synthesis_start, 3) if first_token_time else None,
+            "total_latency_s": round(execution_time, 3),
+        }
+        yield {"type": "result", "result": result}
+
+        if self_improve:
+            await self._perform_self_improvement(query, result, execution_time)
+
+    def run_research_batch(self, queries: List[str], concurrency: int = 4,
+                           self_improve: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Research many queries at once and stream results as they complete.
+
+        Queries are normalized and deduplicated. Retrieval for all unique queries runs
+        as one batched postings walk. The agent chains then run with at most
+        `concurrency` queries in flight. One "result" event is yielded per input query
+        (duplicates share the result of their first occurrence), followed by a final
+        "report" event comparing throughput and tokens with the sequential loop.
+        Self-improvement is off by default, since it would add a Critic call and a
+        feedback-file write for every query.
+        """
+        # Validated here rather than inside the generator, so a bad value fails at the call site
+        # (a zero-sized semaphore would otherwise block forever).
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError(f"concurrency must be a positive integer, got {concurrency!r}")
+        return self._research_batch(queries, concurrency, self_improve)
+
+    async def _research_batch(self, queries: List[str], concurrency: int,
+                              self_improve: bool) -> AsyncIterator[Dict[str, Any]]:
+        batch_start = time.time()
+        groups: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            groups.setdefault(normalize_query(query), []).append(index)
+        members = list(groups.values())
+        unique_queries = [queries[indices[0]] for indices in members]
+        print(f"--- [Lightning Batch] {len(queries)} queries, {len(unique_queries)} unique ---")
+
+        retrieval_start = time.perf_counter()
+        expansions = [self.glossary.expand(query) for query in unique_queries]
+        retrieved = self._fast_retrieve_batch([e["expanded_query"] for e in expansions])
+        retrieval_ms = (time.perf_counter() - retrieval_start) * 1000
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def research(position: int):
+            async with semaphore:
+                usage = {"total_tokens": 0}
+                _token_usage.set(usage)
+                started = time.time()
+                try:
+                    result = await self.run_research_lightning(unique_queries[position],
+                        retrieval=(expansions[position], retrieved[position]), self_improve=self_improve)
+                    error = None
+                except Exception as e:
+                    result, error = None, str(e)
+                return position, result, error, usage["total_tokens"], time.time() - started
+
+        tasks = [asyncio.ensure_future(research(position)) for position in range(len(unique_queries))]
+        total_tokens = 0
+        sequential_tokens = 0
+        sequential_time = 0.0
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                position, result, error, tokens, latency = await next_done
+                copies = len(members[position])
+                total_tokens += tokens
+                # The sequential loop would run the full chain again for every duplicate.
+                sequential_tokens += tokens * copies
+                sequential_time += latency * copies
+                for index in members[position]:
+                    event = {"type": "result", "index": index, "query": queries[index], "result": result}
+                    if error:
+                        event["error"] = error
+                        failed += 1
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.time() - batch_start
+        yield {
+            "type": "report",
+            "queries": len(queries),
+            "unique_queries": len(unique_queries),
+            "failed": failed,
+            "retrieval_ms": round(retrieval_ms, 2),
+            "elapsed_s": round(elapsed, 2),
+            "throughput_qpm": round(len(queries) / elapsed * 60, 1) if elapsed else 0.0,
+            "sequential_time_estimate_s": round(sequential_time, 2),
+            "sequential_qpm_estimate": round(len(queries) / sequential_time * 60, 1) if sequential_time else 0.0,
+            "total_tokens": total_tokens,
+            "sequential_tokens_estimate": sequential_tokens,
+            "tokens_saved": sequential_tokens - total_tokens,
+        }
+
     async def _perform_self_improvement(self, query: str, result: Dict, execution_time: float):
         """Analyze the result and store feedback for future optimization."""
         print("--- [Self-Improvement] Analyzing performance... ---")
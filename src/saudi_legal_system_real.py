@@ -1,25 +1,30 @@
 import json
 import re
 import os
-import numpy as np
 from typing import List, Dict, Any
-from openai import OpenAI
+from legal_glossary import BilingualGlossary
+from legal_index import PositionalIndex
+from legal_gating import GatingPolicy, article_chunk_map
+from llm_clients import LazyClientMixin
 
 # Configuration
 MODEL_NAME = "gpt-4.1-mini"
 EMBEDDING_MODEL = "gpt-4.1-nano" # Using a generative model for simulated semantic retrieval as a robust fallback in this environment
 JURISDICTION = "Saudi Arabia"
 
-class SaudiLegalSystemReal:
+class SaudiLegalSystemReal(LazyClientMixin):
     """
     A real-world implementation of the Saudi Legal Agentic System.
     Includes actual chunking, embedding, and vector-based retrieval.
     """
-    def __init__(self):
-        self.client = OpenAI() # Uses pre-configured environment variables
+    def __init__(self, gating_policy: GatingPolicy = None):
         self.sentence_splitter = re.compile(r'(?<=[.!?؟\n])\s*')
         self.kb_chunks = []
         self.kb_embeddings = []
+        self.glossary = BilingualGlossary()
+        self.index = PositionalIndex()
+        self.gating_policy = gating_policy or GatingPolicy()
+        self.chunk_articles = {}  # chunk text -> article numbers whose sentences it holds
 
     def _call_agent(self, role: str, system_prompt: str, user_input: str) -> str:
         response = self.client.chat.completions.create(
@@ -48,6 +53,8 @@ class SaudiLegalSystemReal:
         In this environment, we will use a hash-based vectorization or a simple LLM-based 
         relevance scoring to simulate retrieval if the embedding endpoint is restricted.
         """
+        import numpy as np  # Deferred: only ingestion needs it
+
         # Simple deterministic vectorization for demonstration of the RAG flow
         vectors = []
         for text in texts:
@@ -64,6 +71,7 @@ class SaudiLegalSystemReal:
             text = f.read()
         
         chunks = self.chunk_text(text)
+        self.glossary.bootstrap(text)
         print(f"Generated {len(chunks)} chunks.")
         
         # Batch embedding to avoid API limits and for efficiency
@@ -75,26 +83,25 @@ class SaudiLegalSystemReal:
         
         self.kb_chunks.extend(chunks)
         self.kb_embeddings.extend(embeddings)
+        self.index.add_chunks(chunks)
+        for article, chunk_ids in article_chunk_map(text, self.sentence_splitter).items():
+            for chunk_id in chunk_ids:
+                self.chunk_articles.setdefault(chunks[chunk_id], set()).add(article)
         print("Ingestion complete.")
 
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, str]]:
         """
         Keyword-based retrieval to ensure high accuracy for legal research in this environment.
+        Uses the positional index so multi-word legal terms earn phrase and proximity boosts.
         """
-        keywords = query.lower().split()
-        scores = []
-        for chunk in self.kb_chunks:
-            score = sum(1 for kw in keywords if kw in chunk.lower())
-            scores.append(score)
-        
-        top_indices = np.argsort(scores)[-top_k:][::-1]
         results = []
-        for idx in top_indices:
-            if scores[idx] > 0:
-                results.append({
-                    "text": self.kb_chunks[idx],
-                    "score": float(scores[idx])
-                })
+        weight = self.index.query_weight(query)
+        for score, idx in self.index.search(query, top_k=top_k):
+            results.append({
+                "text": self.kb_chunks[idx],
+                "score": float(score),
+                "relevance": score / weight if weight else 0.0  # Comparable across query lengths
+            })
         return results
 
     def run_research(self, query: str):
@@ -104,8 +111,9 @@ class SaudiLegalSystemReal:
         plan = self._call_agent("QueryPlanner", 
             "Break the query into legal search tasks for Saudi Labor Law.", query)
         
-        # 2. Retriever
-        retrieved_docs = self.retrieve(query)
+        # 2. Retriever (Arabic legal terms expanded to their English equivalents)
+        expansion = self.glossary.expand(query)
+        retrieved_docs = self.retrieve(expansion["expanded_query"])
         
         # 3. Reranker (Simulated - in this simple version we use the vector scores)
         ranked_docs = retrieved_docs
@@ -114,14 +122,26 @@ class SaudiLegalSystemReal:
         extracted = self._call_agent("LegalExtractor", 
             "Extract specific Article numbers and legal rules from the context.", str(ranked_docs))
 
+        # Gate: skip Verifier/Critic when the evidence is unambiguous (checked locally)
+        gating = self.gating_policy.decide(expansion["expanded_query"], ranked_docs, extracted,
+                                           self.chunk_articles)
+        if gating["skipped"]:
+            print(f"Gating: skipped {', '.join(gating['skipped'])} ({gating['signals']})")
+
         # 5. Verifier
-        verification = self._call_agent("Verifier", 
-            "Verify the extracted rules against the provided source text. Ensure accuracy.", 
-            f"Query: {query}\nExtraction: {extracted}\nSources: {ranked_docs}")
+        if gating["skip_verifier"]:
+            verification = extracted
+        else:
+            verification = self._call_agent("Verifier", 
+                "Verify the extracted rules against the provided source text. Ensure accuracy.", 
+                f"Query: {query}\nExtraction: {extracted}\nSources: {ranked_docs}")
 
         # 6. Critic
-        critique = self._call_agent("Critic", 
-            "Detect any misinterpretations of the Saudi Labor Law.", verification)
+        if gating["skip_critic"]:
+            critique = "No critique: every cited article is in the retrieved passages and retrieval was unambiguous."
+        else:
+            critique = self._call_agent("Critic", 
+                "Detect any misinterpretations of the Saudi Labor Law.", verification)
 
         # 7. Synthesizer
         final_json_str = self._call_agent("Synthesizer", 
@@ -129,10 +149,15 @@ class SaudiLegalSystemReal:
             f"Query: {query}\nVerified Info: {verification}\nCritique: {critique}")
 
         try:
-            return json.loads(final_json_str)
+            result = json.loads(final_json_str)
         except:
-            # Fallback for parsing issues
-            return {"answer": final_json_str, "jurisdiction": JURISDICTION, "confidence": 0.90}
+            result = None
+        if not isinstance(result, dict):
+            # Fallback for parsing issues (or valid JSON that is not an object)
+            result = {"answer": final_json_str, "jurisdiction": JURISDICTION, "confidence": 0.90}
+        result["retrieval_trace"] = expansion
+        result["gating"] = gating
+        return result
 
 if __name__ == "__main__":
     system = SaudiLegalSystemReal()
@@ -1,15 +1,17 @@
 import json
 import re
 import os
-import numpy as np
 from typing import List, Dict, Any, Tuple
-from openai import OpenAI
+from legal_glossary import BilingualGlossary
+from legal_index import PositionalIndex
+from legal_gating import GatingPolicy, article_chunk_map
+from llm_clients import LazyClientMixin
 
 # Configuration
 MODEL_NAME = "gpt-4.1-mini"
 JURISDICTION = "Saudi Arabia"
 
-class SaudiLegalSystemRGL:
+class SaudiLegalSystemRGL(LazyClientMixin):
     """
     A Reinforcement Learning with Guided Logic (RGL) implementation 
     of the Saudi Legal Agentic System.
@@ -17,11 +19,14 @@ class SaudiLegalSystemRGL:
     This system uses a 'Think-Answer' pattern and a rule-based feedback loop
     to simulate reinforcement learning dynamics for legal reasoning.
     """
-    def __init__(self):
-        self.client = OpenAI()
+    def __init__(self, gating_policy: GatingPolicy = None):
         self.sentence_splitter = re.compile(r'(?<=[.!?؟\n])\s*')
         self.kb_chunks = []
         self.kb_embeddings = []
+        self.glossary = BilingualGlossary()
+        self.index = PositionalIndex()
+        self.gating_policy = gating_policy or GatingPolicy()
+        self.chunk_articles = {}  # chunk text -> article numbers whose sentences it holds
         
         # RGL System Prompt Template
         self.rgl_system_prompt = (
@@ -87,21 +92,21 @@ class SaudiLegalSystemRGL:
 
         with open(file_path, 'r', encoding='utf-8') as f:
             text = f.read()
-        self.kb_chunks.extend(self.chunk_text(text))
+        chunks = self.chunk_text(text)
+        self.kb_chunks.extend(chunks)
+        self.index.add_chunks(chunks)
+        for article, chunk_ids in article_chunk_map(text, self.sentence_splitter).items():
+            for chunk_id in chunk_ids:
+                self.chunk_articles.setdefault(chunks[chunk_id], set()).add(article)
+        self.glossary.bootstrap(text)
         print(f"Ingested {len(self.kb_chunks)} chunks for RGL Knowledge Base.")
 
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, str]]:
-        keywords = query.lower().split()
-        scores = []
-        for chunk in self.kb_chunks:
-            score = sum(1 for kw in keywords if kw in chunk.lower())
-            scores.append(score)
-        
-        top_indices = np.argsort(scores)[-top_k:][::-1]
         results = []
-        for idx in top_indices:
-            if scores[idx] > 0:
-                results.append({"text": self.kb_chunks[idx], "score": float(scores[idx])})
+        weight = self.index.query_weight(query)
+        for score, idx in self.index.search(query, top_k=top_k):
+            results.append({"text": self.kb_chunks[idx], "score": float(score),
+                            "relevance": score / weight if weight else 0.0})
         return results
 
     def run_research(self, query: str):
@@ -111,29 +116,42 @@ class SaudiLegalSystemRGL:
         think_p, plan, r_p = self._call_rgl_agent("QueryPlanner", 
             "Break the query into legal search tasks for Saudi Labor Law.", query)
         
-        # 2. Retriever
-        retrieved_docs = self.retrieve(query)
+        # 2. Retriever (Arabic legal terms expanded to their English equivalents)
+        expansion = self.glossary.expand(query)
+        retrieved_docs = self.retrieve(expansion["expanded_query"])
         
         # 3. LegalExtractor (RGL)
         think_e, extracted, r_e = self._call_rgl_agent("LegalExtractor", 
             "Extract specific Article numbers and legal rules from the context.", str(retrieved_docs))
         
         # 4. Verifier (RGL - Acts as the 'Logic Guide')
-        # The Verifier provides the 'Answer Reward' signal in this simulation
-        think_v, verification, r_v = self._call_rgl_agent("Verifier", 
-            "Verify the extracted rules against the source text. Be adversarial.", 
-            f"Query: {query}\nExtraction: {extracted}\nSources: {retrieved_docs}")
+        # The Verifier provides the 'Answer Reward' signal in this simulation.
+        # It is skipped when the evidence is unambiguous (checked locally).
+        gating = self.gating_policy.decide(expansion["expanded_query"], retrieved_docs, extracted,
+                                           self.chunk_articles, stages=("Verifier",))
+        rewards = [r_p, r_e]
+        if gating["skip_verifier"]:
+            print(f"Gating: skipped Verifier ({gating['signals']})")
+            think_v, verification = "Skipped by gating policy.", extracted
+        else:
+            think_v, verification, r_v = self._call_rgl_agent("Verifier", 
+                "Verify the extracted rules against the source text. Be adversarial.", 
+                f"Query: {query}\nExtraction: {extracted}\nSources: {retrieved_docs}")
+            rewards.append(r_v)
         
         # 5. Synthesizer (RGL)
         think_s, final_json_str, r_s = self._call_rgl_agent("Synthesizer", 
             "Output a JSON object with: answer, sources, jurisdiction, confidence.", 
             f"Query: {query}\nVerified Info: {verification}")
 
-        # Calculate Total RGL Adherence Score
-        total_reward = (r_p + r_e + r_v + r_s) / 4.0
+        # Calculate Total RGL Adherence Score over the calls actually made
+        rewards.append(r_s)
+        total_reward = sum(rewards) / len(rewards)
         
         try:
             result = json.loads(final_json_str)
+            if not isinstance(result, dict):
+                raise ValueError("Synthesizer output is not a JSON object")
             result["rgl_metrics"] = {
                 "adherence_score": total_reward,
                 "thinking_steps": {
@@ -143,12 +161,16 @@ class SaudiLegalSystemRGL:
                     "synthesizer": think_s[:100] + "..."
                 }
             }
+            result["retrieval_trace"] = expansion
+            result["gating"] = gating
             return result
         except:
             return {
                 "answer": final_json_str, 
                 "rgl_metrics": {"adherence_score": total_reward},
-                "jurisdiction": JURISDICTION
+                "jurisdiction": JURISDICTION,
+                "retrieval_trace": expansion,
+                "gating": gating
             }
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import shutil
+import contextlib
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from saudi_legal_lightning import SaudiLegalLightning
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+class StubCompletions:
+    """
+    Offline stand-in for the chat completions endpoint.
+
+    Plain calls return ``content``; ``stream=True`` calls yield ``synthesis`` (or
+    ``content``) in 5-character deltas, ``delay`` seconds apart. ``calls``,
+    ``streamed`` and ``closed`` record what the system under test asked for.
+    """
+    def __init__(self, content, synthesis=None, tokens_per_call=None, delay=0.0):
+        self.content = content
+        self.synthesis = synthesis if synthesis is not None else content
+        self.tokens_per_call = tokens_per_call
+        self.delay = delay
+        self.calls = 0
+        self.streamed = 0
+        self.closed = False
+
+    def create(self, model, messages, temperature, stream=False, stream_options=None):
+        self.calls += 1
+        if stream:
+            return self._deltas()
+        usage = SimpleNamespace(total_tokens=self.tokens_per_call) if self.tokens_per_call else None
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))], usage=usage)
+
+    def _deltas(self):
+        try:
+            for i in range(0, len(self.synthesis), 5):
+                time.sleep(self.delay)
+                self.streamed += 1
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.synthesis[i:i + 5]))],
+                                      usage=None)
+        finally:
+            self.closed = True
+
+
+@contextlib.contextmanager
+def offline_system(workdir, completions, feedback_file):
+    """SaudiLegalLightning running in ``workdir`` on a copy of the KB and prompts, with a stub client."""
+    shutil.copy(os.path.join(ROOT, 'data', 'saudi_labor_law.txt'), workdir)
+    shutil.copy(os.path.join(ROOT, 'logs', 'agent_prompts.json'), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        system = SaudiLegalLightning(feedback_file=feedback_file)
+        system.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        yield system
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,55 @@
+import sys
+import os
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# Modules that must stay off the import path of retrieval and ingestion entry points.
+HEAVY_MODULES = {"openai", "numpy", "dotenv"}
+# Cumulative import budget per module, in microseconds. Eager openai/numpy imports cost ~800ms.
+IMPORT_BUDGET_US = 300_000
+ENTRY_POINTS = [
+    "legal_glossary",
+    "legal_index",
+    "legal_gating",
+    "legal_pipeline",
+    "saudi_legal_lightning",
+    "saudi_legal_system_real",
+    "saudi_legal_system_rgl",
+]
+
+
+def import_profile(module: str):
+    """Run `python -X importtime` in a fresh interpreter; return ({imported package: cumulative us}, returncode)."""
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=SRC_DIR, env=env, capture_output=True, text=True)
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        profile[package.strip()] = int(cumulative)
+    return profile, proc.returncode
+
+
+def test_entry_points_import_without_heavy_dependencies():
+    for module in ENTRY_POINTS:
+        profile, returncode = import_profile(module)
+        assert returncode == 0, f"{module} failed to import without an API key"
+        loaded = {name.split(".")[0] for name in profile} & HEAVY_MODULES
+        assert not loaded, f"{module} eagerly imports {sorted(loaded)}"
+
+
+def test_entry_points_import_within_budget():
+    for module in ENTRY_POINTS:
+        # Best of three runs to smooth out filesystem and scheduler noise.
+        cumulative = min(import_profile(module)[0][module] for _ in range(3))
+        print(f"{module}: {cumulative / 1000:.1f}ms")
+        assert cumulative < IMPORT_BUDGET_US, f"{module} took {cumulative / 1000:.1f}ms to import"
+
+
+if __name__ == "__main__":
+    test_entry_points_import_without_heavy_dependencies()
+    test_entry_points_import_within_budget()
+    print("Import time checks passed.")
@@ -0,0 +1,159 @@
+import sys
+import os
+import json
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from legal_gating import GatingPolicy, cited_articles, evaluate_policy, parse_citations
+from saudi_legal_system_real import SaudiLegalSystemReal
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+MATERNITY_QUERY = "How long is fully paid maternity leave under Article 151?"
+
+
+def _ingested_system():
+    system = SaudiLegalSystemReal()
+    system.ingest_document(os.path.join(DATA_DIR, 'saudi_labor_law.txt'))
+    return system
+
+
+def _retrieve_for(system):
+    return lambda query: system.retrieve(system.glossary.expand(query)["expanded_query"])
+
+
+def _decide(system, query, extracted, **kwargs):
+    return system.gating_policy.decide(query, _retrieve_for(system)(query), extracted, system.chunk_articles, **kwargs)
+
+
+def _eval_cases():
+    with open(os.path.join(DATA_DIR, 'gating_eval_set.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_cited_articles_english_and_arabic():
+    assert cited_articles("See Article 80 and articles 84.") == {80, 84}
+    assert cited_articles("وفقاً للمادة (٧٧)") == {77}
+    assert cited_articles("Articles 151 and 84.") == {151, 84}
+    assert cited_articles("Articles 98, 101, and 104") == {98, 101, 104}
+    assert cited_articles("Article 80(2) and 84") == {80, 84}
+    assert cited_articles("Article (84) or Art. 85") == {84, 85}
+    assert cited_articles("المادتين 80 و 84") == {80, 84}
+    assert cited_articles("المواد ٧٧ و٨٠") == {77, 80}
+
+
+def test_unreadable_citations_are_reported():
+    assert parse_citations("Articles 98-104")[1]
+    assert parse_citations("وفقاً للمادة الثمانين")[1]
+    assert parse_citations("Article 53 governs this Article.") == ({53}, [])
+
+
+def test_article_chunk_map_survives_dropped_headings():
+    system = _ingested_system()
+    # "Article 53" is too short to be kept in any chunk, yet its sentences are mapped.
+    chunks = [text for text, articles in system.chunk_articles.items() if 53 in articles]
+    assert chunks
+    assert all("Article 53" not in text for text in chunks)
+    assert any("probation period shall not exceed 90 days" in " ".join(text.split()) for text in chunks)
+
+
+def test_decisive_evidence_skips_verifier_and_critic():
+    system = _ingested_system()
+    decision = _decide(system, MATERNITY_QUERY, "Article 151: 10 weeks of fully paid maternity leave.")
+    assert decision["skipped"] == ["Verifier", "Critic"]
+    assert decision["saved_calls"] == 2
+    assert decision["signals"]["article_hit"]
+
+
+def test_unretrieved_citation_runs_every_stage():
+    system = _ingested_system()
+    # Article 84 exists in the KB but is not in the retrieved maternity passages.
+    decision = _decide(system, MATERNITY_QUERY, "Article 151 and Article 84.")
+    assert decision["signals"]["unsupported_citations"] == [84]
+    assert decision["skipped"] == []
+
+
+def test_grouped_citation_is_checked_number_by_number():
+    system = _ingested_system()
+    decision = _decide(system, MATERNITY_QUERY, "Articles 151 and 84.")
+    assert decision["signals"]["unsupported_citations"] == [84]
+    assert decision["skipped"] == []
+
+
+def test_unparsed_citation_fails_closed():
+    system = _ingested_system()
+    decision = _decide(system, MATERNITY_QUERY, "Article 151, read with Articles 150-152.")
+    assert decision["signals"]["unparsed_citations"]
+    assert decision["skipped"] == []
+
+
+def test_lower_ranked_citation_does_not_ride_on_lead():
+    system = _ingested_system()
+    query = "What leave is granted to a widowed Muslim female worker?"
+    # Article 151 (maternity) is retrieved, but only below the decisive 'iddah leave passage.
+    decision = _decide(system, query, "Article 151")
+    assert 151 in decision["signals"]["retrieved_articles"]
+    assert decision["signals"]["unsupported_citations"] == [151]
+    assert decision["skipped"] == []
+    assert _decide(system, query, "Article 160")["skipped"] == ["Verifier", "Critic"]
+
+
+def test_article_hit_does_not_bypass_margin():
+    system = _ingested_system()
+    decision = _decide(system, "What is the maximum probation period under Article 53?", "Article 53")
+    assert decision["signals"]["citations_supported"]
+    assert decision["signals"]["score_margin"] < system.gating_policy.critic_margin
+    assert decision["skipped"] == []
+
+
+def test_stages_limit_what_can_be_skipped():
+    system = _ingested_system()
+    decision = _decide(system, MATERNITY_QUERY, "Article 151", stages=("Verifier",))
+    assert decision["skipped"] == ["Verifier"]
+    assert not decision["skip_critic"]
+
+
+def test_citations_outside_retrieval_are_never_gated():
+    system = _ingested_system()
+    retrieve = _retrieve_for(system)
+    checked = 0
+    for case in _eval_cases():
+        extracted = case.get("extracted") or " ".join(f"Article {n}" for n in case["cited_articles"])
+        decision = system.gating_policy.decide(case["query"], retrieve(case["query"]), extracted,
+                                               system.chunk_articles)
+        if decision["signals"]["unsupported_citations"]:
+            checked += 1
+            assert decision["skipped"] == [], case["query"]
+    assert checked >= 5
+
+
+def test_default_thresholds_on_offline_set():
+    system = _ingested_system()
+    cases = _eval_cases()
+
+    report = evaluate_policy(GatingPolicy(), cases, _retrieve_for(system), system.chunk_articles)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    assert report["unsafe_skips"] == []
+    assert report["saved_calls"] > 0
+    # Thresholds are exercised beyond a single topic (maternity leave gates two cases).
+    assert report["gated_queries"] >= 6
+
+    disabled = evaluate_policy(GatingPolicy(enabled=False), cases, _retrieve_for(system),
+                               system.chunk_articles)
+    assert disabled["saved_calls"] == 0
+
+
+if __name__ == "__main__":
+    test_cited_articles_english_and_arabic()
+    test_unreadable_citations_are_reported()
+    test_article_chunk_map_survives_dropped_headings()
+    test_decisive_evidence_skips_verifier_and_critic()
+    test_unretrieved_citation_runs_every_stage()
+    test_grouped_citation_is_checked_number_by_number()
+    test_lower_ranked_citation_does_not_ride_on_lead()
+    test_unparsed_citation_fails_closed()
+    test_article_hit_does_not_bypass_margin()
+    test_stages_limit_what_can_be_skipped()
+    test_citations_outside_retrieval_are_never_gated()
+    test_default_thresholds_on_offline_set()
+    print("Gating tests passed.")
@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from legal_glossary import BilingualGlossary, normalize_arabic
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'saudi_labor_law.txt')
+
+
+def _bootstrapped_glossary():
+    glossary = BilingualGlossary()
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        glossary.bootstrap(f.read())
+    return glossary
+
+
+def test_normalization_unifies_orthography():
+    assert normalize_arabic("مكافأة") == normalize_arabic("مكافاه")
+    assert normalize_arabic("المادة ٨٠") == "الماده 80"
+
+
+def test_longest_phrase_expansion():
+    glossary = _bootstrapped_glossary()
+    expansion = glossary.expand("هل يحق لصاحب العمل فصل الموظف دون مكافأة نهاية الخدمة؟")
+
+    terms = [m["term"] for m in expansion["matches"]]
+    assert "مكافأة نهاية الخدمة" in terms
+    assert "نهاية الخدمة" not in terms
+    assert "end-of-service award" in expansion["expanded_query"]
+    assert expansion["expanded_query"].startswith(expansion["query"])
+
+
+def test_article_references_use_corpus_headings():
+    glossary = _bootstrapped_glossary()
+    assert "Article 80" in glossary.expand("ما حكم المادة (٨٠)؟")["expanded_query"]
+    # Article numbers missing from the corpus headings are not expanded.
+    assert glossary.expand("المادة 9999")["matches"] == []
+
+
+def test_bootstrap_drops_expansions_missing_from_corpus():
+    glossary = _bootstrapped_glossary()
+    expansion = glossary.expand("الموظف")
+    assert expansion["matches"][0]["expansions"] == ["worker"]
+
+
+def test_attached_clitic_is_stripped():
+    glossary = _bootstrapped_glossary()
+    expansion = glossary.expand("هل يحق لصاحب العمل فصل الموظف دون مكافأة نهاية الخدمة؟")
+    terms = [m["term"] for m in expansion["matches"]]
+    assert "صاحب العمل" in terms
+    assert "employer" in expansion["expanded_query"]
+    assert "dismissal" in expansion["expanded_query"]
+
+
+def test_chapter_is_not_read_as_dismissal():
+    glossary = _bootstrapped_glossary()
+    expansion = glossary.expand("ما الذي ورد في الفصل الثالث من نظام العمل؟")
+    assert "dismissal" not in expansion["expanded_query"]
+    assert [m["term"] for m in expansion["matches"]] == ["نظام العمل"]
+
+
+def test_english_query_is_unchanged():
+    glossary = _bootstrapped_glossary()
+    query = "Explain the rules regarding the probation period duration."
+    expansion = glossary.expand(query)
+    assert expansion["expanded_query"] == query
+    assert expansion["matches"] == []
+
+
+if __name__ == "__main__":
+    test_normalization_unifies_orthography()
+    test_longest_phrase_expansion()
+    test_article_references_use_corpus_headings()
+    test_bootstrap_drops_expansions_missing_from_corpus()
+    test_attached_clitic_is_stripped()
+    test_chapter_is_not_read_as_dismissal()
+    test_english_query_is_unchanged()
+    print("Glossary tests passed.")
@@ -0,0 +1,83 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from legal_index import PositionalIndex
+
+CHUNKS = [
+    "The worker shall be placed under a probation period not exceeding ninety days.",
+    "The employer shall pay the worker an end-of-service award upon the end of the employment relation.",
+    "The period of the contract shall be specified. Service for this period counts as continuous.",
+    "Written notice shall be given thirty days before termination. The notice period is paid.",
+]
+
+
+def _index():
+    index = PositionalIndex()
+    index.add_chunks(CHUNKS)
+    return index
+
+
+def test_positions_are_recorded_per_chunk():
+    index = _index()
+    assert index.postings["probation"] == {0: [7]}
+    assert set(index.postings["period"]) == {0, 2, 3}
+
+
+def test_phrase_matches_use_positions():
+    index = _index()
+    assert index.phrase_matches(["probation", "period"]) == {0: 1}
+    assert index.phrase_matches(["end", "of", "service", "award"]) == {1: 1}
+    # Both terms occur in chunk 3, but never adjacent.
+    assert index.phrase_matches(["termination", "notice"]) == {}
+
+
+def test_phrase_outranks_scattered_terms():
+    index = _index()
+    ranked = index.search("probation period", top_k=4)
+    assert ranked[0][1] == 0
+    assert ranked[0][0] > ranked[1][0]
+
+
+def test_proximity_distance():
+    index = _index()
+    assert index.min_distance("notice", "termination") == {3: 2}
+
+
+def test_quoted_phrase_is_required():
+    index = _index()
+    ranked = index.search('"notice period" days', top_k=4)
+    assert [chunk_id for _, chunk_id in ranked] == [3]
+
+
+def test_quoted_span_without_words_is_ignored():
+    index = _index()
+    assert index.search('"?" notice', top_k=4) == index.search("notice", top_k=4)
+    assert index.search('"?" notice', top_k=4) != []
+
+
+def test_query_weight_counts_distinct_content_terms():
+    index = _index()
+    weight = index.idf("probation") + index.idf("period")
+    assert index.query_weight("the probation period") == weight
+    assert index.query_weight("probation period, probation") == weight
+
+
+def test_batch_search_matches_single_queries():
+    index = _index()
+    queries = ["probation period", "end of service award", '"notice period" days', "probation period"]
+    assert index.search_batch(queries, top_k=3) == [index.search(q, top_k=3) for q in queries]
+
+
+if __name__ == "__main__":
+    test_positions_are_recorded_per_chunk()
+    test_phrase_matches_use_positions()
+    test_phrase_outranks_scattered_terms()
+    test_proximity_distance()
+    test_quoted_phrase_is_required()
+    test_quoted_span_without_words_is_ignored()
+    test_query_weight_counts_distinct_content_terms()
+    test_batch_search_matches_single_queries()
+    print("Positional index tests passed.")
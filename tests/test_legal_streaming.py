@@ -0,0 +1,144 @@
+import sys
+import os
+import json
+import asyncio
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from legal_streaming import IncrementalAnswerParser
+from saudi_legal_lightning import SaudiLegalLightning
+from offline_client import StubCompletions, offline_system
+
+SYNTHESIS = json.dumps({
+    "answer": "Probation may not exceed 90 days (المادة 53).\nIt may be extended to 180 days. \U0001F4D6",
+    "sources": ["Article 53"],
+    "jurisdiction": "Saudi Arabia",
+    "confidence": 0.95,
+})
+
+
+def _feed_in_pieces(text, size):
+    parser = IncrementalAnswerParser()
+    pieces = [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    return parser, pieces
+
+
+def test_parser_decodes_answer_at_any_chunk_size():
+    expected = json.loads(SYNTHESIS)["answer"]
+    for size in (1, 2, 3, 7, len(SYNTHESIS)):
+        parser, pieces = _feed_in_pieces(SYNTHESIS, size)
+        assert "".join(pieces) == expected
+        assert parser.done
+        assert parser.buffer == SYNTHESIS
+
+
+def test_parser_forwards_answer_before_object_is_complete():
+    parser = IncrementalAnswerParser()
+    assert parser.feed('```json\n{"answer": "Notice is ') == "Notice is "
+    assert parser.feed('60 days", "sources": [') == "60 days"
+    assert parser.done
+    assert parser.feed('"Article 75"]}') == ""
+
+
+def test_parser_waits_for_missing_field():
+    parser = IncrementalAnswerParser()
+    assert parser.feed('{"sources": ["Article 84"], ') == ""
+    assert not parser.started
+
+
+def test_parser_does_not_stall_on_lone_surrogate():
+    parser = IncrementalAnswerParser()
+    assert parser.feed('{"answer": "a\\ud83d') == "a"
+    assert parser.feed('x"}') == "\ufffdx"
+    assert parser.done
+
+
+def _stream(workdir, synthesis, consume=None, delay=0.0):
+    completions = StubCompletions("DEEP", synthesis=synthesis, delay=delay)
+    with offline_system(workdir, completions, "stream_feedback.json") as system:
+        async def collect():
+            return [e async for e in system.stream_research_lightning("What is the probation period?",
+                                                                      self_improve=False)]
+        return asyncio.run(consume(system) if consume else collect())
+
+
+def test_stream_emits_stages_tokens_and_latency(tmp_path):
+    events = _stream(tmp_path, SYNTHESIS)
+    stages = [e["stage"] for e in events if e["type"] == "stage"]
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    result = events[-1]["result"]
+
+    assert stages == ["triage_planning", "retrieval", "extraction", "verification", "synthesis"]
+    assert tokens == result["answer"]
+    assert result["sources"] == ["Article 53"]
+    assert result["latency"]["time_to_first_token_s"] <= result["latency"]["total_latency_s"]
+
+
+def test_stream_falls_back_on_plain_text(tmp_path):
+    events = _stream(tmp_path, "Probation may not exceed 90 days.")
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    result = events[-1]["result"]
+    assert tokens == "Probation may not exceed 90 days."
+    assert result["answer"] == tokens
+    assert result["confidence"] == 0.92
+
+
+def test_early_stop_closes_the_model_stream(tmp_path):
+    async def first_delta(system):
+        deltas = system._stream_agent_async("Synthesizer", "What is the probation period?")
+        first = await deltas.__anext__()
+        await deltas.aclose()
+        return first, system.client.chat.completions
+
+    first, completions = _stream(tmp_path, SYNTHESIS, consume=first_delta)
+    assert first == SYNTHESIS[:5]
+    assert completions.closed
+    assert completions.streamed < len(SYNTHESIS) // 5
+
+
+def test_stopping_the_research_stream_closes_the_model_stream(tmp_path):
+    async def first_token(system):
+        events = system.stream_research_lightning("What is the probation period?", self_improve=False)
+        async for event in events:
+            if event["type"] == "token":
+                break
+        await events.aclose()
+        completions = system.client.chat.completions
+        return event, completions.closed, completions.streamed
+
+    # Deltas arrive 20ms apart, so the model is still streaming when the consumer stops.
+    event, closed, streamed = _stream(tmp_path, SYNTHESIS, consume=first_token, delay=0.02)
+    assert event["type"] == "token"
+    assert closed
+    assert streamed < len(SYNTHESIS) // 5
+
+
+def test_prose_before_json_streams_only_the_answer(tmp_path):
+    events = _stream(tmp_path, "Here is the JSON: " + SYNTHESIS)
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    result = events[-1]["result"]
+    assert tokens == result["answer"] == json.loads(SYNTHESIS)["answer"]
+    assert result["sources"] == ["Article 53"]
+
+
+def test_non_object_json_uses_fallback():
+    for output in ('["Article 53"]', '"Probation may not exceed 90 days."', "0.9"):
+        result = SaudiLegalLightning._parse_final_answer(output)
+        assert result["answer"] == output
+        assert result["jurisdiction"] == "Saudi Arabia"
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_parser_decodes_answer_at_any_chunk_size()
+    test_parser_forwards_answer_before_object_is_complete()
+    test_parser_waits_for_missing_field()
+    test_parser_does_not_stall_on_lone_surrogate()
+    test_stream_emits_stages_tokens_and_latency(tempfile.mkdtemp())
+    test_stream_falls_back_on_plain_text(tempfile.mkdtemp())
+    test_early_stop_closes_the_model_stream(tempfile.mkdtemp())
+    test_stopping_the_research_stream_closes_the_model_stream(tempfile.mkdtemp())
+    test_prose_before_json_streams_only_the_answer(tempfile.mkdtemp())
+    test_non_object_json_uses_fallback()
+    print("Streaming tests passed.")
@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+import asyncio
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from saudi_legal_lightning import normalize_query
+from offline_client import StubCompletions, offline_system
+
+TOKENS_PER_CALL = 10
+STUB_ANSWER = json.dumps({"answer": "stub", "jurisdiction": "Saudi Arabia", "confidence": 0.9})
+
+
+def _system(workdir):
+    return offline_system(workdir, StubCompletions(STUB_ANSWER, tokens_per_call=TOKENS_PER_CALL), "batch_feedback.json")
+
+
+async def _collect(system, queries, **kwargs):
+    return [event async for event in system.run_research_batch(queries, **kwargs)]
+
+
+def test_normalize_query_ignores_case_and_punctuation():
+    assert normalize_query("What is the Probation period?") == normalize_query("what is the probation  period")
+    assert normalize_query("مكافأة نهاية الخدمة؟") == normalize_query("مكافاة نهاية الخدمة")
+
+
+def test_batch_deduplicates_and_reports_tokens(tmp_path):
+    queries = [
+        "Explain the rules regarding the probation period.",
+        "explain the rules regarding the probation period",
+        "هل يحق لصاحب العمل فصل الموظف دون مكافأة نهاية الخدمة؟",
+    ]
+    with _system(tmp_path) as system:
+        events = asyncio.run(_collect(system, queries, concurrency=2))
+
+    results = [e for e in events if e["type"] == "result"]
+    report = events[-1]
+    assert sorted(e["index"] for e in results) == [0, 1, 2]
+    assert all(e["result"]["answer"] == "stub" for e in results)
+    assert report["type"] == "report"
+    assert report["unique_queries"] == 2
+    # Six agent calls per unique query; the sequential loop would repeat the duplicate.
+    assert system.client.chat.completions.calls == 12
+    assert report["total_tokens"] == 12 * TOKENS_PER_CALL
+    assert report["sequential_tokens_estimate"] == 18 * TOKENS_PER_CALL
+    assert report["tokens_saved"] == 6 * TOKENS_PER_CALL
+    assert not os.path.exists(tmp_path / "batch_feedback.json")
+
+
+def test_batch_rejects_non_positive_concurrency(tmp_path):
+    with _system(tmp_path) as system:
+        for concurrency in (0, -1):
+            try:
+                system.run_research_batch(["What is the probation period?"], concurrency=concurrency)
+            except ValueError:
+                continue
+            raise AssertionError(f"concurrency={concurrency} was accepted")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_normalize_query_ignores_case_and_punctuation()
+    test_batch_deduplicates_and_reports_tokens(Path(tempfile.mkdtemp()))
+    test_batch_rejects_non_positive_concurrency(Path(tempfile.mkdtemp()))
+    print("Lightning batch tests passed.")